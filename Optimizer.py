@@ -0,0 +1,189 @@
+from ParkingSim import ParkingLot, VehicleAgent, getResults
+
+from multiprocessing import Pool
+from random import Random
+import random
+import numpy as np
+import math
+
+
+# Parámetros base del constructor de ParkingLot
+baseParams = {
+  "numPermVehicles": 3,
+  "numTempVehicles": 5,
+  "numActiveVehicles": 50,
+  "spawnPercentage": 0.2,
+  "reservePercentage": 0.1,
+  "reservationHoldingTime": 15,
+  "badAgentPercentage": 0
+}
+
+# Rangos de búsqueda por defecto (enteros si ambos límites son enteros)
+defaultSpace = {
+  "reservationHoldingTime": (5, 40),
+  "reservePercentage": (0.0, 0.5)
+}
+
+# --------------------------- Evaluación de modelos ---------------------------
+def getObjectives(model):
+  '''
+  Calcula los objetivos a minimizar a partir de los resultados del modelo:
+  el promedio de steps de búsqueda de todos los vehículos (con y sin
+  reservación) y la cantidad de reservaciones expiradas.
+  '''
+  results = getResults(model)
+  numVehicles = model.vehicleParkCount
+  numReserve = model.reserveParkCount
+
+  # Promedio ponderado por la cantidad de vehículos de cada tipo
+  if numVehicles + numReserve > 0:
+    avgSearch = (results["avgVehiclePark"] * numVehicles + results["avgReservePark"] * numReserve) / (numVehicles + numReserve)
+  else:
+    avgSearch = float('inf')
+
+  return (avgSearch, results["reservationsExpired"])
+
+def isSettled(model):
+  '''
+  Indica si ya no quedan vehículos por llegar ni vehículos buscando lugar, por
+  lo que seguir simulando no cambia los resultados.
+  '''
+  if not model.running:
+    return True
+  if model.arrivalSource != None or model.numActiveVehicles > 0:
+    return False
+  for agent in model.scheduler.agents:
+    if isinstance(agent, VehicleAgent) and agent.pos != None and not agent.isParked:
+      return False
+  return True
+
+def evaluateCandidate(args):
+  '''
+  Corre una réplica de la simulación con los parámetros del candidato hasta que
+  se usan todos los vehículos activos (o hasta maxSteps) y regresa sus
+  objetivos. Se ejecuta en un proceso trabajador.
+  '''
+  params, seed, maxSteps = args
+  # La réplica n usa la misma semilla en todos los candidatos (números aleatorios comunes)
+  random.seed(seed)
+  np.random.seed(seed)
+
+  model = ParkingLot(**params)
+  for i in range(maxSteps):
+    model.step()
+    if isSettled(model):
+      break
+
+  return getObjectives(model)
+
+def averageObjectives(objectives):
+  '''
+  Promedia los objetivos de varias réplicas. El tiempo de búsqueda se promedia
+  solo entre las réplicas con vehículos estacionados; es infinito únicamente si
+  ninguna réplica estacionó vehículos.
+  '''
+  searches = [o[0] for o in objectives if math.isfinite(o[0])]
+  avgSearch = sum(searches) / len(searches) if searches else float('inf')
+  avgExpired = sum(o[1] for o in objectives) / len(objectives)
+  return (avgSearch, avgExpired)
+
+# ----------------------------- Frente de Pareto -----------------------------
+def dominates(a, b):
+  '''
+  Indica si los objetivos a dominan a los objetivos b.
+  '''
+  return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+def paretoRanks(objectives):
+  '''
+  Ordenamiento no dominado: regresa el número de frente de cada punto
+  (0 = frente de Pareto).
+  '''
+  ranks = [None] * len(objectives)
+  remaining = set(range(len(objectives)))
+  rank = 0
+
+  while remaining:
+    front = [i for i in remaining if not any(dominates(objectives[j], objectives[i]) for j in remaining if j != i)]
+    for i in front:
+      ranks[i] = rank
+    remaining -= set(front)
+    rank += 1
+
+  return ranks
+
+def paretoFront(results):
+  '''
+  Regresa los resultados que no son dominados por ningún otro.
+  '''
+  ranks = paretoRanks([result["objectives"] for result in results])
+  return [result for result, rank in zip(results, ranks) if rank == 0]
+
+# --------------------------- Successive halving ---------------------------
+def sampleCandidate(space, params, rng):
+  '''
+  Genera un candidato aleatorio dentro del espacio de búsqueda.
+  '''
+  candidate = dict(params)
+  for name, (low, high) in space.items():
+    if isinstance(low, int) and isinstance(high, int):
+      candidate[name] = rng.randint(low, high)
+    else:
+      candidate[name] = rng.uniform(low, high)
+  return candidate
+
+def optimize(space = defaultSpace, params = baseParams, numCandidates = 27, minSeeds = 1, maxSeeds = 9, eta = 3, minSurvivors = 4, maxSteps = 1000, workers = None, seed = 0):
+  '''
+  Busca los parámetros de ParkingLot que minimizan el tiempo promedio de
+  búsqueda y las reservaciones expiradas usando successive halving. El
+  presupuesto de cada ronda es la cantidad de réplicas (semillas) por
+  candidato: en cada ronda se conserva la fracción 1 / eta con mejor rango de
+  Pareto y los sobrevivientes se evalúan, en paralelo, con eta veces más
+  réplicas. Regresa el frente de Pareto de la última ronda con los objetivos
+  promediados entre réplicas.
+  '''
+  if numCandidates < 1 or minSeeds < 1 or maxSeeds < minSeeds or maxSteps < 1:
+    raise ValueError("numCandidates, minSeeds y maxSteps deben ser mayores o iguales a 1 y maxSeeds >= minSeeds")
+  if eta <= 1:
+    raise ValueError("eta debe ser mayor a 1, se recibió %s" % eta)
+
+  rng = Random(seed)
+  candidates = [sampleCandidate(space, params, rng) for i in range(numCandidates)]
+  # Objetivos de cada réplica ya evaluada por candidato
+  replications = [[] for candidate in candidates]
+  alive = list(range(numCandidates))
+  seeds = minSeeds
+
+  with Pool(workers) as pool:
+    while True:
+      # Evalúa solo las réplicas que le faltan a cada sobreviviente
+      tasks = [(i, seed + n) for i in alive for n in range(len(replications[i]), seeds)]
+      objectives = pool.map(evaluateCandidate, [(candidates[i], replicaSeed, maxSteps) for i, replicaSeed in tasks])
+      for (i, replicaSeed), objective in zip(tasks, objectives):
+        replications[i].append(objective)
+
+      results = [{"params": candidates[i], "seeds": seeds, "objectives": averageObjectives(replications[i])} for i in alive]
+
+      # Termina al llegar al máximo de réplicas
+      if seeds >= maxSeeds:
+        break
+      numSurvivors = max(minSurvivors, math.ceil(len(alive) / eta))
+
+      # Descarta los candidatos claramente malos: ordena por frente de Pareto
+      # y desempata por la suma de los objetivos normalizados
+      averages = [result["objectives"] for result in results]
+      ranks = paretoRanks(averages)
+      finite = [o for o in averages if float('inf') not in o]
+      scales = [max([o[k] for o in finite] + [1]) for k in range(2)]
+      order = sorted(range(len(alive)), key = lambda k: (ranks[k], sum(o / s for o, s in zip(averages[k], scales))))
+      alive = [alive[k] for k in order[:numSurvivors]]
+      seeds = min(math.ceil(seeds * eta), maxSeeds)
+
+  front = paretoFront(results)
+  front.sort(key = lambda result: result["objectives"])
+  return front
+
+if __name__ == "__main__":
+  for result in optimize():
+    values = {name: result["params"][name] for name in defaultSpace}
+    print(values, "-> avgSearch: %.2f, reservationsExpired: %.2f" % result["objectives"])
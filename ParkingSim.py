@@ -6,9 +6,12 @@ from IPython.display import HTML
 from random import random
 from random import choice
 from random import randrange
+from collections import deque
 import numpy as np
 import uuid
 import time
+import json
+import csv
 
 
 # --------------------------- Información en JSON ---------------------------
@@ -57,20 +60,19 @@ def getResults(model): # Valeria
     "avgVehiclePark": 0,
     "avgReservePark": 0,
     "reservationsExpired": 0,
+    "arrivalsDropped": 0,
   }
 
   # Obtiene la información recolectada del modelo
-  vehicleParkData = model.vehicleParkData
-  reserveParkData = model.reserveParkData
   reservationsExpired = model.reservationsExpired
 
   # Calcula el promedio de tiempo que los vehículos tardan en estacionarse
-  if vehicleParkData:
-    avgVehiclePark = sum(vehicleParkData) / len(vehicleParkData)
+  if model.vehicleParkCount:
+    avgVehiclePark = model.vehicleParkTotal / model.vehicleParkCount
   else:
     avgVehiclePark = 0
-  if reserveParkData:
-    avgReservePark = sum(reserveParkData) / len(reserveParkData)
+  if model.reserveParkCount:
+    avgReservePark = model.reserveParkTotal / model.reserveParkCount
   else:
     avgReservePark = 0
 
@@ -78,9 +80,177 @@ def getResults(model): # Valeria
   data["avgVehiclePark"] = avgVehiclePark
   data["avgReservePark"] = avgReservePark
   data["reservationsExpired"] = reservationsExpired
+  data["arrivalsDropped"] = model.arrivalsDropped
 
   return data
 
+# --------------------------- Fuentes de llegadas ---------------------------
+def parseArrival(row, where, lastTick = None):
+  '''
+  Convierte un registro de llegada a diccionario y valida sus campos. Lanza
+  ValueError indicando el registro (where) si algún campo es inválido.
+  '''
+  try:
+    tick = int(row["tick"])
+    entrance = int(row["entrance"])
+    dwell = int(row["dwell"])
+  except (KeyError, TypeError, ValueError) as error:
+    raise ValueError("%s: registro de llegada inválido (%s)" % (where, error))
+
+  reservation = row.get("reservation", False)
+  if isinstance(reservation, str):
+    reservation = reservation.strip().lower() in ("1", "true", "yes")
+
+  # Un tiempo estacionado menor a 1 nunca llega a 0 y el vehículo no se va
+  if dwell < 1:
+    raise ValueError("%s: dwell debe ser mayor o igual a 1, se recibió %d" % (where, dwell))
+  if entrance < 0 or entrance > 3:
+    raise ValueError("%s: entrance debe estar entre 0 y 3, se recibió %d" % (where, entrance))
+  if lastTick != None and tick < lastTick:
+    raise ValueError("%s: los registros deben estar ordenados por tick (%d < %d)" % (where, tick, lastTick))
+
+  return {
+    "tick": tick,
+    "entrance": entrance,
+    "dwell": dwell,
+    "reservation": bool(reservation)
+  }
+
+class ArrivalSource:
+  '''
+  Fuente de llegadas que el modelo consulta en cada step. Recibe un iterable de
+  registros ordenados por tick, cada uno con el tick de llegada, la entrada
+  (índice 0-3 de los puntos de entrada), el tiempo estacionado y si tiene
+  reservación. Los registros se consumen de forma perezosa, por lo que la
+  memoria no depende del largo del calendario.
+  '''
+  def __init__(self, records = ()):
+    self.rows = records
+    self.records = self.readRecords()
+    # Siguiente registro leído que todavía no ocurre
+    self.nextRecord = next(self.records, None)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def readRecords(self):
+    '''
+    Generador que valida los registros uno por uno.
+    '''
+    lastTick = None
+    for number, row in enumerate(self.rows, 1):
+      record = parseArrival(row, "registro %d" % number, lastTick)
+      lastTick = record["tick"]
+      yield record
+
+  def arrivals(self, tick):
+    '''
+    Regresa la lista de llegadas que ocurren hasta el tick dado.
+    '''
+    arrivals = []
+    # Consume los registros hasta llegar a uno que ocurra después del tick
+    while self.nextRecord != None and self.nextRecord["tick"] <= tick:
+      arrivals.append(self.nextRecord)
+      self.nextRecord = next(self.records, None)
+    return arrivals
+
+  def isExhausted(self, tick = None):
+    '''
+    Indica si la fuente ya no generará más llegadas.
+    '''
+    return self.nextRecord == None
+
+  def close(self):
+    '''
+    Libera los recursos de la fuente; ya no genera más llegadas.
+    '''
+    self.records.close()
+    self.nextRecord = None
+
+class PoissonArrivals(ArrivalSource):
+  '''
+  Proceso de Poisson con tasa variable en el tiempo. Recibe la tasa de llegadas
+  por entrada por step, ya sea como número o como función del tick (por ejemplo,
+  una curva de hora pico), el porcentaje de reservaciones, el rango del tiempo
+  estacionado y el tick en el que se dejan de generar llegadas (None = infinito).
+  '''
+  def __init__(self, rate, reservePercentage = 0, dwellRange = (5, 50), horizon = None):
+    super().__init__()
+    if dwellRange[0] < 1 or dwellRange[1] <= dwellRange[0]:
+      raise ValueError("dwellRange debe cumplir 1 <= mínimo < máximo, se recibió %s" % (dwellRange,))
+    self.rate = rate
+    self.reservePercentage = reservePercentage
+    self.dwellRange = dwellRange
+    self.horizon = horizon
+    self.closed = False
+
+  def arrivals(self, tick):
+    if self.isExhausted(tick):
+      return []
+
+    # Obtiene la tasa de llegadas para el tick actual
+    rate = self.rate(tick) if callable(self.rate) else self.rate
+    arrivals = []
+
+    # Calcula la cantidad de llegadas en cada entrada
+    for entrance, count in enumerate(np.random.poisson(max(rate, 0), 4)):
+      for i in range(count):
+        arrivals.append({
+          "tick": tick,
+          "entrance": entrance,
+          "dwell": randrange(self.dwellRange[0], self.dwellRange[1], 2),
+          "reservation": random() < self.reservePercentage
+        })
+    return arrivals
+
+  def isExhausted(self, tick = None):
+    if self.closed:
+      return True
+    return self.horizon != None and tick != None and tick >= self.horizon
+
+  def close(self):
+    self.closed = True
+
+class GateLogArrivals(ArrivalSource):
+  '''
+  Reproduce un registro de las entradas del estacionamiento en formato CSV o
+  JSONL, leyéndolo línea por línea. Cada registro debe tener los campos
+  tick, entrance, dwell y reservation, y el archivo debe estar ordenado por tick.
+  El archivo permanece abierto hasta terminar la lectura o llamar a close().
+  '''
+  def __init__(self, path, fileFormat = None):
+    self.path = path
+    # Deduce el formato a partir de la extensión del archivo
+    if fileFormat == None:
+      fileFormat = "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+    self.fileFormat = fileFormat
+    super().__init__()
+
+  def readRecords(self):
+    '''
+    Generador que lee y valida el archivo registro por registro.
+    '''
+    lastTick = None
+    with open(self.path, newline = "") as file:
+      if self.fileFormat == "jsonl":
+        rows = ((number, line) for number, line in enumerate(file, 1) if line.strip())
+      else:
+        reader = csv.DictReader(file)
+        rows = ((reader.line_num, row) for row in reader)
+
+      for number, row in rows:
+        if self.fileFormat == "jsonl":
+          try:
+            row = json.loads(row)
+          except ValueError as error:
+            raise ValueError("%s, línea %d: JSON inválido (%s)" % (self.path, number, error))
+        record = parseArrival(row, "%s, línea %d" % (self.path, number), lastTick)
+        lastTick = record["tick"]
+        yield record
+
 # ----------------------------- Agente Vehículo -----------------------------
 class VehicleAgent(Agent):
   '''
@@ -293,9 +463,11 @@ class VehicleAgent(Agent):
       self.isParked = True
       self.isParking = False
       if self.hasReservation:
-        self.model.reserveParkData.append(self.parkCounter)
+        self.model.reserveParkCount += 1
+        self.model.reserveParkTotal += self.parkCounter
       else:
-        self.model.vehicleParkData.append(self.parkCounter)
+        self.model.vehicleParkCount += 1
+        self.model.vehicleParkTotal += self.parkCounter
 
   def step(self): # TBD
     '''
@@ -334,6 +506,7 @@ class VehicleAgent(Agent):
       # Si ya llegó a la salida, elimina el agente
       if self.pos == self.exitTarget:
         self.model.grid.remove_agent(self)
+        self.model.scheduler.remove(self)
         del self
         return
 
@@ -447,7 +620,9 @@ class ParkingLot(Model):
   luces indicadoras. Recibe como entrada la cantidad de vehículos estacionados a
   instanciar, los vehículos temporalmente estacionados, los vehículos que estarán
   en movimiento durante la simulación, el porcentaje de spawn aleatorio, el porcentaje
-  de reservaciones aleatorias, y el tiempo de reservación.
+  de reservaciones aleatorias, y el tiempo de reservación. Opcionalmente recibe
+  una fuente de llegadas (ArrivalSource) que reemplaza a la fila de vehículos y
+  el tamaño máximo de la fila de llegadas en espera.
 
   Posibles estados de inicio para agente vehículo:
     -> Inicia en un espacio ya estacionado, con un tiempo de espera (random) y
@@ -459,7 +634,7 @@ class ParkingLot(Model):
       -> Busca el espacio más cercano
       -> Reserva un espacio y se dirige a su reservación
   '''
-  def __init__(self, numPermVehicles, numTempVehicles, numActiveVehicles, spawnPercentage, reservePercentage, reservationHoldingTime, badAgentPercentage):
+  def __init__(self, numPermVehicles, numTempVehicles, numActiveVehicles, spawnPercentage, reservePercentage, reservationHoldingTime, badAgentPercentage, arrivalSource = None, maxArrivalBacklog = 100):
     super().__init__()
     self.width = 15
     self.height = 14
@@ -481,12 +656,24 @@ class ParkingLot(Model):
     self.reservedSpaces = []
     # Lista de vehículos en fila para ser posicionados
     self.vehicleQueue = []
-    # Guarda información de cuánto tardan en estacionarse vehículos libres
-    self.vehicleParkData = []
-    # Guarda información de cuánto tardan en estacionarse vehículos con reservación
-    self.reserveParkData = []
+    # Cantidad de vehículos libres estacionados y suma de los steps que tardaron
+    self.vehicleParkCount = 0
+    self.vehicleParkTotal = 0
+    # Cantidad de vehículos con reservación estacionados y suma de los steps que tardaron
+    self.reserveParkCount = 0
+    self.reserveParkTotal = 0
     # Cuenta la cantidad de reservaciones que se expiraron durante la simulación
     self.reservationsExpired = 0
+    # Fuente de llegadas (None = fila de vehículos con spawn aleatorio)
+    self.arrivalSource = arrivalSource
+    # Llegadas de la fuente que esperan a que se libere su entrada
+    self.arrivalBacklog = deque()
+    # Cantidad máxima de llegadas en espera
+    self.maxArrivalBacklog = maxArrivalBacklog
+    # Cuenta las llegadas descartadas por tener la fila de espera llena
+    self.arrivalsDropped = 0
+    # Cantidad de steps transcurridos
+    self.tick = 0
 
     # Crear agentes de luces indicadoras en cada cajón de estacionamiento
     idLights = 0
@@ -549,7 +736,7 @@ class ParkingLot(Model):
     self.placeParkedVehicles(numTempVehicles, 0)
 
     # Crea primeros vehículos en movimiento y los agrega a la fila
-    spawnCount = min(4, numActiveVehicles)
+    spawnCount = min(4, numActiveVehicles) if arrivalSource == None else 0
     for i in range(spawnCount):
       # isParked, parkedTime, lightTarget
       vehicle = VehicleAgent(str(uuid.uuid4()), self, False, randrange(5, 50, 5), None, False)
@@ -615,11 +802,73 @@ class ParkingLot(Model):
           self.scheduler.add(vehicle)
           self.vehicleQueue.append(vehicle)
 
+  def spawnArrivals(self):
+    '''
+    Obtiene las llegadas del tick actual desde la fuente de llegadas y coloca
+    los vehículos en su entrada. Si la entrada está ocupada, la llegada espera
+    en la fila de pendientes; si la fila está llena, la llegada se descarta.
+    '''
+    # Lista de coordenadas de puntos de entrada
+    spawnPoints = [(1,0), (13,0), (0,14), (12,14)]
+
+    for arrival in self.arrivalSource.arrivals(self.tick):
+      if len(self.arrivalBacklog) < self.maxArrivalBacklog:
+        self.arrivalBacklog.append(arrival)
+      else:
+        self.arrivalsDropped += 1
+
+    # Coloca los vehículos pendientes cuya entrada esté libre
+    for i in range(len(self.arrivalBacklog)):
+      arrival = self.arrivalBacklog.popleft()
+      pos = spawnPoints[arrival["entrance"]]
+      if not self.isEntranceClear(pos):
+        self.arrivalBacklog.append(arrival)
+        continue
+
+      vehicle = VehicleAgent(str(uuid.uuid4()), self, False, arrival["dwell"], None, False)
+      vehicle.spawnPos = pos
+
+      # Decisión de reservación de espacio al entrar al estacionamiento
+      if arrival["reservation"]:
+        tempLight = LightAgent("tempLight", self, 0)
+        tempLight.reserveParkingSpot(vehicle, pos)
+
+      # Decisión del agente malo
+      elif random() < self.badAgentPercentage:
+        vehicle.isBadAgent = True
+
+      self.scheduler.add(vehicle)
+      self.grid.place_agent(vehicle, pos)
+
+  def isEntranceClear(self, pos):
+    '''
+    Revisa que la entrada no esté ocupada por un vehículo.
+    '''
+    for agent in self.grid.get_cell_list_contents([pos]):
+      if isinstance(agent, VehicleAgent):
+        return False
+    return True
+
   def step(self):
     '''
     Avanza una iteración en el modelo.
     '''
     self.scheduler.step()
+    if self.arrivalSource != None:
+      self.spawnArrivals()
+      # Termina la simulación cuando la fuente se agota y no quedan vehículos
+      if self.arrivalSource.isExhausted(self.tick) and not self.arrivalBacklog and not self.hasMovingVehicles():
+        self.running = False
     # Mientras existan vehículos en la fila por agregar al tablero
-    if len(self.vehicleQueue) <= 4 and len(self.vehicleQueue) > 0:
-      self.spawnVehicles()
\ No newline at end of file
+    elif len(self.vehicleQueue) <= 4 and len(self.vehicleQueue) > 0:
+      self.spawnVehicles()
+    self.tick += 1
+
+  def hasMovingVehicles(self):
+    '''
+    Revisa si quedan vehículos que no sean permanentes en el estacionamiento.
+    '''
+    for agent in self.scheduler.agents:
+      if isinstance(agent, VehicleAgent) and agent.parkedTime != -1:
+        return True
+    return False
\ No newline at end of file
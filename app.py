@@ -1,5 +1,8 @@
 from flask import Flask, request
-from ParkingSim import ParkingLot, getData
+from ParkingSim import ParkingLot, getData, getResults as getModelResults
+from Optimizer import optimize
+from threading import Thread, Lock
+import math
 
 app = Flask(__name__)
 
@@ -45,19 +48,11 @@ def changeModel():
 
 @app.route('/results')
 def getResults():
-  vehicleParkData = parkingSim.vehicleParkData
-  reserveParkData = parkingSim.reserveParkData
-  reservationsExpired = parkingSim.reservationsExpired
-
-  if vehicleParkData:
-    avgVehiclePark = sum(vehicleParkData) / len(vehicleParkData)
-  else:
-    avgVehiclePark = 0
-  if reserveParkData:
-    avgReservePark = sum(reserveParkData) / len(reserveParkData)
-  else:
-    avgReservePark = 0
-  
+  results = getModelResults(parkingSim)
+  avgVehiclePark = results["avgVehiclePark"]
+  avgReservePark = results["avgReservePark"]
+  reservationsExpired = results["reservationsExpired"]
+
   data = {
     "first": f'El promedio de steps que tardaron los vehiculos sin reservacion en estacionarse fue: {avgVehiclePark}',
     "second": f'El promedio de steps que tardaron los vehiculos con reservacion previa en estacionarse fue: {avgReservePark}',
@@ -66,4 +61,69 @@ def getResults():
 
   return data
 
-app.run()
\ No newline at end of file
+
+# Estado de la optimización que corre en segundo plano
+optimization = {
+  "running": False,
+  "front": None,
+  "error": None
+}
+# Protege la revisión y el inicio de la optimización entre peticiones
+optimizationLock = Lock()
+
+def runOptimization(params, numCandidates, maxSeeds):
+  front = None
+  error = None
+  try:
+    front = [{
+      "reservationHoldingTime": result["params"]["reservationHoldingTime"],
+      "reservePercentage": result["params"]["reservePercentage"],
+      # Un candidato sin vehículos estacionados no tiene promedio (Infinity no es JSON válido)
+      "avgSearch": result["objectives"][0] if math.isfinite(result["objectives"][0]) else None,
+      "reservationsExpired": result["objectives"][1]
+    } for result in optimize(params=params, numCandidates=numCandidates, maxSeeds=maxSeeds)]
+  except Exception as exception:
+    error = str(exception)
+  finally:
+    with optimizationLock:
+      optimization["front"] = front
+      optimization["error"] = error
+      optimization["running"] = False
+
+@app.route('/optimize', methods=['POST'])
+def optimizeModel():
+  try:
+    numCandidates = int(request.form.get('numCandidates', 27))
+    maxSeeds = int(request.form.get('maxSeeds', 9))
+  except ValueError:
+    return "numCandidates and maxSeeds must be integers", 400
+  if numCandidates < 1 or maxSeeds < 1:
+    return "numCandidates and maxSeeds must be at least 1", 400
+
+  params = {
+    "numPermVehicles": numPermVehicles,
+    "numTempVehicles": numTempVehicles,
+    "numActiveVehicles": numActiveVehicles,
+    "spawnPercentage": spawnPercentage,
+    "reservePercentage": reservePercentage,
+    "reservationHoldingTime": reservationHoldingTime,
+    "badAgentPercentage": badAgentPercentage
+  }
+
+  # Corre la optimización en segundo plano para no bloquear la petición
+  with optimizationLock:
+    if optimization["running"]:
+      return "Optimization already running", 409
+    optimization["running"] = True
+    optimization["front"] = None
+    optimization["error"] = None
+  Thread(target=runOptimization, args=(params, numCandidates, maxSeeds), daemon=True).start()
+  return "OK", 202
+
+
+@app.route('/optimize/results')
+def getOptimization():
+  return optimization
+
+if __name__ == "__main__":
+  app.run()
@@ -0,0 +1,135 @@
+import random
+
+import numpy as np
+import pytest
+
+from ParkingSim import ParkingLot, ArrivalSource, PoissonArrivals, GateLogArrivals, VehicleAgent
+
+
+@pytest.fixture(autouse=True)
+def seed():
+  random.seed(0)
+  np.random.seed(0)
+
+def writeLog(tmp_path, name, lines):
+  path = tmp_path / name
+  path.write_text("\n".join(lines) + "\n")
+  return str(path)
+
+def countVehicles(model):
+  return sum(1 for agent in model.scheduler.agents if isinstance(agent, VehicleAgent))
+
+def test_gate_log_replay(tmp_path):
+  path = writeLog(tmp_path, "gate.csv", [
+    "tick,entrance,dwell,reservation",
+    "0,0,5,false",
+    "0,1,5,true",
+    "3,2,7,0",
+  ])
+  source = GateLogArrivals(path)
+  model = ParkingLot(0, 0, 0, 0, 0, 15, 0, source)
+
+  model.step()
+  assert countVehicles(model) == 2
+  model.step()
+  model.step()
+  model.step()
+  assert countVehicles(model) == 3
+  assert source.isExhausted()
+
+  # La simulación termina cuando todos los vehículos se van
+  steps = 0
+  while model.running and steps < 500:
+    model.step()
+    steps += 1
+  assert not model.running
+  assert countVehicles(model) == 0
+  assert model.vehicleParkCount + model.reserveParkCount == 3
+
+def test_gate_log_jsonl(tmp_path):
+  path = writeLog(tmp_path, "gate.jsonl", [
+    '{"tick": 0, "entrance": 3, "dwell": 5, "reservation": true}',
+    '{"tick": 2, "entrance": 0, "dwell": 9, "reservation": false}',
+  ])
+  with GateLogArrivals(path) as source:
+    assert source.arrivals(1) == [{"tick": 0, "entrance": 3, "dwell": 5, "reservation": True}]
+    assert source.arrivals(2)[0]["dwell"] == 9
+    assert source.isExhausted()
+
+@pytest.mark.parametrize("name, header, valid, row, message", [
+  ("gate.csv", "tick,entrance,dwell,reservation", "0,0,5,false", "0,0,0,false", "dwell"),
+  ("gate.csv", "tick,entrance,dwell,reservation", "0,0,5,false", "0,0,-1,false", "dwell"),
+  ("gate.csv", "tick,entrance,dwell,reservation", "0,0,5,false", "0,7,5,false", "entrance"),
+  ("gate.csv", "tick,entrance,dwell,reservation", "0,0,5,false", "0,-1,5,false", "entrance"),
+  ("gate.jsonl", '{"tick": 0, "entrance": 0, "dwell": 5}', '{"tick": 0, "entrance": 1, "dwell": 5}', '{tick: 0,', "JSON inválido"),
+])
+def test_gate_log_rejects_invalid_records(tmp_path, name, header, valid, row, message):
+  path = writeLog(tmp_path, name, [header, valid, row])
+  source = GateLogArrivals(path)
+  with pytest.raises(ValueError, match = "línea 3: " + message):
+    source.arrivals(0)
+
+def test_gate_log_rejects_unsorted_ticks(tmp_path):
+  path = writeLog(tmp_path, "gate.csv", ["tick,entrance,dwell,reservation", "5,0,5,false", "2,0,5,false"])
+  with pytest.raises(ValueError, match = "ordenados"):
+    GateLogArrivals(path).arrivals(10)
+
+def test_gate_log_close(tmp_path):
+  path = writeLog(tmp_path, "gate.csv", ["tick,entrance,dwell,reservation", "0,0,5,false", "9,0,5,false"])
+  source = GateLogArrivals(path)
+  source.close()
+  assert source.isExhausted()
+  assert source.arrivals(10) == []
+
+def test_arrival_source_from_records():
+  source = ArrivalSource([{"tick": 1, "entrance": 2, "dwell": 3}])
+  assert source.arrivals(0) == []
+  assert source.arrivals(1) == [{"tick": 1, "entrance": 2, "dwell": 3, "reservation": False}]
+  assert source.isExhausted()
+
+def test_poisson_horizon():
+  source = PoissonArrivals(5, horizon = 10)
+  assert len(source.arrivals(9)) > 0
+  assert source.arrivals(10) == []
+  assert source.isExhausted(10)
+  assert not source.isExhausted(9)
+
+def test_poisson_time_varying_rate():
+  source = PoissonArrivals(lambda tick: 0 if tick < 5 else 5)
+  assert source.arrivals(0) == []
+  assert len(source.arrivals(5)) > 0
+
+def test_poisson_rejects_invalid_dwell():
+  with pytest.raises(ValueError):
+    PoissonArrivals(1, dwellRange = (0, 10))
+
+def test_poisson_ends_simulation_after_horizon():
+  model = ParkingLot(0, 0, 0, 0, 0, 15, 0, PoissonArrivals(0.2, horizon = 50))
+  steps = 0
+  while model.running and steps < 1000:
+    model.step()
+    steps += 1
+  assert not model.running
+  assert countVehicles(model) == 0
+
+def test_memory_does_not_grow_with_arrivals():
+  model = ParkingLot(0, 0, 0, 0, 0, 15, 0, PoissonArrivals(0.1))
+  for i in range(600):
+    model.step()
+  # Solo quedan las luces y los vehículos que siguen en el estacionamiento
+  assert countVehicles(model) <= len(model.parkingSpaces) + 20
+  # Las métricas se guardan como totales, no como una entrada por vehículo
+  assert model.vehicleParkCount > countVehicles(model)
+  for name in ("vehicleParkCount", "vehicleParkTotal", "reserveParkCount", "reserveParkTotal"):
+    assert isinstance(getattr(model, name), int)
+  assert not any(isinstance(value, (list, dict)) and len(value) > len(model.parkingSpaces) for value in vars(model).values())
+
+def test_backlog_is_bounded_when_lot_jams():
+  model = ParkingLot(0, 0, 0, 0, 0, 15, 0, PoissonArrivals(0.3, reservePercentage = 0.2), maxArrivalBacklog = 50)
+  for i in range(600):
+    model.step()
+  assert len(model.arrivalBacklog) <= 50
+  assert model.arrivalsDropped > 0
+  # Las llegadas en espera no tienen reservación ni agente
+  assert all(isinstance(arrival, dict) for arrival in model.arrivalBacklog)
+  assert model.reservationsExpired < 20
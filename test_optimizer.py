@@ -0,0 +1,85 @@
+import math
+from threading import Event, Thread
+
+import pytest
+
+from ParkingSim import ParkingLot
+from Optimizer import baseParams, dominates, paretoRanks, paretoFront, averageObjectives, getObjectives, evaluateCandidate, optimize
+import app
+
+
+def test_dominates():
+  assert dominates((1, 1), (2, 2))
+  assert dominates((1, 2), (1, 3))
+  assert not dominates((1, 1), (1, 1))
+  assert not dominates((1, 3), (2, 2))
+  assert not dominates((2, 2), (1, 3))
+
+def test_pareto_ranks():
+  objectives = [(1, 5), (2, 2), (5, 1), (3, 3), (6, 6), (2, 2)]
+  assert paretoRanks(objectives) == [0, 0, 0, 1, 2, 0]
+
+def test_pareto_front():
+  results = [{"objectives": o} for o in [(4, 0), (1, 3), (2, 2), (3, 3)]]
+  assert [result["objectives"] for result in paretoFront(results)] == [(4, 0), (1, 3), (2, 2)]
+
+def test_average_objectives():
+  assert averageObjectives([(4, 1), (6, 2)]) == (5, 1.5)
+
+def test_average_objectives_ignores_empty_replications():
+  assert averageObjectives([(4, 1), (math.inf, 0), (6, 2)]) == (5, 1)
+  assert averageObjectives([(math.inf, 0), (math.inf, 2)]) == (math.inf, 1)
+
+def test_objectives_without_parked_vehicles():
+  model = ParkingLot(0, 0, 0, 0, 0, 15, 0)
+  assert getObjectives(model) == (math.inf, 0)
+
+def test_evaluation_stops_when_vehicles_settle():
+  # Con maxSteps alto el resultado es el mismo que al terminar los vehículos
+  assert evaluateCandidate((baseParams, 0, 300)) == evaluateCandidate((baseParams, 0, 5000))
+
+@pytest.mark.parametrize("kwargs", [{"eta": 1}, {"minSeeds": 0}, {"maxSteps": 0}, {"numCandidates": 0}])
+def test_optimize_rejects_invalid_budget(kwargs):
+  with pytest.raises(ValueError):
+    optimize(**kwargs)
+
+def test_optimize_returns_pareto_front():
+  front = optimize(numCandidates = 4, maxSeeds = 3, minSurvivors = 2, workers = 2)
+  assert len(front) >= 1
+  for result in front:
+    assert result["seeds"] == 3
+    assert 5 <= result["params"]["reservationHoldingTime"] <= 40
+  assert paretoRanks([result["objectives"] for result in front]) == [0] * len(front)
+
+def test_optimize_route_rejects_invalid_input():
+  client = app.app.test_client()
+  assert client.post('/optimize', data = {"numCandidates": "abc"}).status_code == 400
+  assert client.post('/optimize', data = {"maxSeeds": "0"}).status_code == 400
+  assert client.get('/optimize/results').get_json() == {"running": False, "front": None, "error": None}
+
+def test_optimize_route_starts_one_run_at_a_time(monkeypatch):
+  started = Event()
+  release = Event()
+
+  def slowOptimize(**kwargs):
+    started.set()
+    release.wait(5)
+    return []
+
+  monkeypatch.setattr(app, "optimize", slowOptimize)
+  client = app.app.test_client()
+  statuses = []
+  requests = [Thread(target = lambda: statuses.append(client.post('/optimize').status_code)) for i in range(4)]
+  for thread in requests:
+    thread.start()
+  for thread in requests:
+    thread.join()
+
+  assert started.wait(5)
+  assert sorted(statuses) == [202, 409, 409, 409]
+  release.set()
+  for i in range(100):
+    if not client.get('/optimize/results').get_json()["running"]:
+      break
+    release.wait(0.05)
+  assert client.get('/optimize/results').get_json() == {"running": False, "front": [], "error": None}